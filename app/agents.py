@@ -1,11 +1,134 @@
-from typing import Optional, Union
+from typing import Any, Optional, Union
 from crewai import Agent, Task, Crew, Process, LLM
 from crewai.tools import BaseTool
 import requests
-import json
+import functools
+import httpx
+import litellm
+import orjson
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from string import Template
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+import lxml.html
+from lxml import etree
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .config import Config
 from .schemas import LeadOutput
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Shared HTTP session so SearXNG and crawl calls reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+# Background workers for speculative search prefetches nobody waits on
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=4)
+# Separate workers for contact pages a crawl will block on, so they never queue behind speculation
+_CONTACT_POOL = ThreadPoolExecutor(max_workers=8)
+# Longest a crawl waits for its contact page: 8s read timeout across the adapter's retries and backoff
+_CONTACT_WAIT = 20
+
+# Raw response bodies keyed by (url, params, max_bytes); agents and duplicate leads repeat the same requests.
+# Bounded by total bytes rather than entries, since crawled pages run up to MAX_PAGE_BYTES each
+_RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+_RESPONSE_CACHE = TTLCache(maxsize=_RESPONSE_CACHE_BYTES, ttl=3600, getsizeof=len)
+_CACHE_LOCK = threading.Lock()
+_IN_FLIGHT = {}
+
+# Formatted tool output: SearXNG keyed by (host, query, brand filter), crawls by normalized URL
+_SEARCH_RESULT_CACHE = TTLCache(maxsize=512, ttl=3600)
+_CRAWL_RESULT_CACHE = TTLCache(maxsize=256, ttl=600)
+
+# Crawled pages are read up to this many bytes; header, footer and ~2.5KB of body text live well within it
+MAX_PAGE_BYTES = 256_000
+
+def _download(url: str, params: dict, timeout: int, max_bytes: int) -> bytes:
+    # Stream capped reads so huge pages are never fully downloaded or held in memory
+    with _SESSION.get(url, params=params, timeout=timeout, stream=max_bytes is not None) as response:
+        response.raise_for_status()
+        if max_bytes is None:
+            return response.content
+        # Capped reads are page crawls; PDFs, images and downloads aren't worth reading or parsing
+        content_type = response.headers.get('Content-Type', '').lower()
+        if content_type and 'html' not in content_type and not content_type.startswith('text/'):
+            raise ValueError(f"Not an HTML page ({content_type})")
+        chunks, size = [], 0
+        for chunk in response.iter_content(32_768):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+        return b''.join(chunks)[:max_bytes]
+
+def _remember(key: tuple, content: bytes):
+    """Store a response body unless it alone would overflow the cache's byte budget."""
+    if len(content) <= _RESPONSE_CACHE_BYTES:
+        _RESPONSE_CACHE[key] = content
+
+def _fetch(url: str, params: dict = None, timeout: int = 10, use_cache: bool = True, max_bytes: int = None) -> bytes:
+    key = (url, tuple(sorted(params.items())) if params else (), max_bytes)
+    if not use_cache:
+        content = _download(url, params, timeout, max_bytes)
+        with _CACHE_LOCK:
+            _remember(key, content)
+        return content
+
+    with _CACHE_LOCK:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+        # Identical requests already on the wire (prefetches, parallel crews) share one download
+        future = _IN_FLIGHT.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = _IN_FLIGHT[key] = Future()
+    if not is_owner:
+        # Bounded by the owner's first try plus the adapter's two retries, so a stuck owner can't hang every duplicate
+        return future.result(timeout=timeout * 3 + 5)
+
+    try:
+        content = _download(url, params, timeout, max_bytes)
+    except BaseException as e:
+        # BaseException too: an owner leaving its entry or future unresolved would block later identical requests
+        with _CACHE_LOCK:
+            del _IN_FLIGHT[key]
+        future.set_exception(e)
+        raise
+    with _CACHE_LOCK:
+        _remember(key, content)
+        del _IN_FLIGHT[key]
+    future.set_result(content)
+    return content
+
+class _AlnumTranslator(dict):
+    """str.translate table that keeps alphanumerics (Unicode-aware, like str.isalnum) and drops the rest.
+
+    Entries are filled on first sight, so repeat lookups stay inside translate's C loop.
+    """
+    def __missing__(self, codepoint):
+        value = codepoint if chr(codepoint).isalnum() else None
+        self[codepoint] = value
+        return value
+
+_ALNUM_ONLY = _AlnumTranslator()
+
+# Snippet keywords that mark a search result as business-relevant
+_FILTER_KEYWORDS = ('uae', 'gcc', 'business', 'company', 'contact', 'phone', 'email', 'maps')
+
+# Social, job and marketplace sites that are never a brand's official website
+_EXCLUDED_SITES = ('linkedin', 'facebook', 'instagram', 'twitter', 'indeed', 'glassdoor', 'wikipedia', 'youtube', 'vinted', 'depop', 'ebay', 'amazon', 'pinterest')
+_EXCLUDED_SITES_RE = re.compile('|'.join(map(re.escape, _EXCLUDED_SITES)))
+_UAE_PATH_RE = re.compile(r'/uae|dubai')
 
 class SearXNGSearchTool(BaseTool):
     name: str = "searxng_search"
@@ -15,36 +138,76 @@ class SearXNGSearchTool(BaseTool):
     searx_host: str = "http://localhost:8888" 
     brand_name_filter: str = "" # Added for filtering
 
-    def _run(self, query: str) -> str:
+    # Matching forms of brand_name_filter, derived once per tool instead of on every search
+    _brand_kw: str = PrivateAttr(default="")
+    _brand_kw_normalized: str = PrivateAttr(default="")
+    _brand_words: list = PrivateAttr(default_factory=list)
+    _keyword_re: re.Pattern = PrivateAttr(default=None)
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        self._brand_kw = self.brand_name_filter.lower() if self.brand_name_filter else ""
+        # Normalize brand keyword for better matching (remove special chars)
+        self._brand_kw_normalized = self._brand_kw.translate(_ALNUM_ONLY)
+        self._brand_words = [w for w in self._brand_kw_normalized.split() if len(w) > 2] # focus on significant words
+        if not self._brand_words and self._brand_kw_normalized:
+            self._brand_words = [self._brand_kw_normalized]
+        # One alternation scans each snippet once; an empty brand keyword is an empty
+        # alternative, so every result passes just as `'' in text` did
+        self._keyword_re = re.compile('|'.join(map(re.escape, _FILTER_KEYWORDS + (self._brand_kw,))))
+
+    def _run(self, query: str, use_cache: bool = True) -> str:
         try:
+            # Handle cases where the agent passes a dictionary (legacy support)
+            if isinstance(query, dict):
+                 query = query.get('query') or query.get('q') or str(query)
+            # Collapse whitespace so equivalent queries share a cache entry
+            query = ' '.join(str(query).split())
+            search_url = f"{self.searx_host}/search"
+
+            # Repeat searches (agent retries, .ae fallbacks, duplicate brands) skip parsing and scoring too
+            result_key = (search_url, query, self._brand_kw)
+            if use_cache:
+                with _CACHE_LOCK:
+                    cached = _SEARCH_RESULT_CACHE.get(result_key)
+                if cached is not None:
+                    return cached
+
             params = {
                 "q": query,
                 "format": "json",
-                "engines": "google,bing,duckduckgo,qwant",
+                "engines": Config.SEARXNG_ENGINES,
+                # Cap how long SearXNG waits on a slow engine before answering with what it has
+                "timeout_limit": Config.SEARXNG_TIMEOUT_LIMIT,
                 "categories": "general",
                 "safesearch": 0,
                 # Removed time_range to get more relevant results
                 "language": "en-US"
             }
-            # Handle cases where the agent passes a dictionary (legacy support)
-            if isinstance(query, dict):
-                 query = query.get('query') or query.get('q') or str(query)
 
-            response = requests.get(f"{self.searx_host}/search", params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Limit to business-relevant snippets
+            data = orjson.loads(_fetch(search_url, params=params, timeout=15, use_cache=use_cache))
             raw_results = data.get("results", [])
-            brand_kw = self.brand_name_filter.lower() if self.brand_name_filter else ""
+
+            # Widen to the slower engines only when the fast ones come back thin
+            fallback_failed = False
+            if len(raw_results) < 3 and Config.SEARXNG_FALLBACK_ENGINES != Config.SEARXNG_ENGINES:
+                params["engines"] = Config.SEARXNG_FALLBACK_ENGINES
+                try:
+                    data = orjson.loads(_fetch(search_url, params=params, timeout=15, use_cache=use_cache))
+                    raw_results = data.get("results", []) or raw_results
+                except Exception as e:
+                    # A slow-engine timeout shouldn't discard the results already in hand
+                    print(f"SearXNG fallback search failed for '{query}': {e}")
+                    fallback_failed = True
             
-            # Normalize brand keyword for better matching (remove special chars)
-            brand_kw_normalized = ''.join(c for c in brand_kw if c.isalnum())
+            # Limit to business-relevant snippets
+            brand_kw_normalized = self._brand_kw_normalized
+            brand_words = self._brand_words
+            keyword_re = self._keyword_re
             
             filtered_results = [
                 r for r in raw_results 
-                if any(kw in (r.get('title', '') + r.get('content', '')).lower() 
-                       for kw in ['uae', 'gcc', 'business', 'company', 'contact', 'phone', 'email', 'maps', brand_kw])
+                if keyword_re.search(((r.get('title') or '') + (r.get('content') or '')).lower())
             ]
             
             # Use filtered results, or fallback to raw if empty (to avoid total silence)
@@ -53,39 +216,38 @@ class SearXNGSearchTool(BaseTool):
             if not results:
                 return "No results found for this business."
 
-            # Extract potential official website from results
-            scored_sites = []
-            brand_words = [w for w in brand_kw_normalized.split() if len(w) > 2] # focus on significant words
-            if not brand_words and brand_kw_normalized:
-                brand_words = [brand_kw_normalized]
+            # Extract potential official website from results in a single pass. SearXNG returns
+            # absolute URLs, so a root URL matching the brand, its words and UAE scores highest
+            # of all; once a result reaches that, later ones cannot beat it.
+            official_website = None
+            best_score = 0
+            top_score = (50 if brand_kw_normalized else 0) + 20 * len(brand_words) + 30
 
             for res in raw_results[:15]:  # Check top 15 for official site
-                url = res.get('url', '').lower()
+                url = (res.get('url') or '').lower()
                 domain = url.split('//')[-1].split('/')[0]
+                domain_compact = domain.replace('.', '')
                 
-                if not any(excluded in url for excluded in ['linkedin', 'facebook', 'instagram', 'twitter', 'indeed', 'glassdoor', 'wikipedia', 'youtube', 'vinted', 'depop', 'ebay', 'amazon', 'pinterest']):
+                if not _EXCLUDED_SITES_RE.search(url):
                     score = 0
                     # Exact brand in domain (high score)
-                    if brand_kw_normalized and brand_kw_normalized in domain.replace('.', ''):
+                    if brand_kw_normalized and brand_kw_normalized in domain_compact:
                         score += 50
                     # Words match in domain (significant boost)
                     for word in brand_words:
                         if word in domain:
                             score += 20
                     # UAE focus
-                    if '.ae' in domain or '/uae' in url or 'dubai' in url:
+                    if '.ae' in domain or _UAE_PATH_RE.search(url):
                         score += 30
                     # Shorter URLs preferred for official sites (penalty for deep links)
                     score -= (len(url.split('/')) - 3) * 5
                     
-                    if score > 0:
-                        scored_sites.append((score, res.get('url')))
-            
-            # Pick the highest scored site
-            official_website = None
-            if scored_sites:
-                scored_sites.sort(key=lambda x: x[0], reverse=True)
-                official_website = scored_sites[0][1]
+                    # Strict '>' keeps the earliest of equally scored sites
+                    if score > best_score:
+                        best_score, official_website = score, res.get('url')
+                        if best_score >= top_score:
+                            break
             
             formatted = []
             if official_website:
@@ -99,19 +261,108 @@ class SearXNGSearchTool(BaseTool):
                     f"URL: {res.get('url')}\n"
                 )
             
-            return "\n---\n".join(formatted)
+            result = "\n---\n".join(formatted)
+            # Don't pin results thinned by a transient fallback failure in the cache
+            if not fallback_failed:
+                with _CACHE_LOCK:
+                    _SEARCH_RESULT_CACHE[result_key] = result
+            return result
         except Exception as e:
             return f"Local Search Error: {str(e)}"
 
+# Comments and processing instructions are never read, so the parser skips building nodes for them
+_HTML_PARSER = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+_NOISE_TAGS = ("script", "style", "svg", "path", "iframe")
+_WS_RE = re.compile(r'\s+')
+_HEADER_RE = re.compile(r'header', re.I)
+_FOOTER_RE = re.compile(r'footer', re.I)
+_HEADER_ALT_RE = re.compile(r'header|top|nav', re.I)
+_FOOTER_ALT_RE = re.compile(r'footer|bottom', re.I)
+_CONTACT_TEXT_RE = re.compile(r'contact|about-us|find-us|locations', re.I)
+_CONTACT_HREF_RE = re.compile(r'contact|about|location', re.I)
+
+# Contact details scanned across a whole page's text, so ones deep in the page (or only in mailto:/tel: links) aren't lost to truncation.
+# The phone prefix needs a left boundary so digit runs like data-id="1700971234567890" don't yield a number
+_UAE_PHONE_RE = re.compile(r'(?<![\w+])(?:\+|00)\s?971[\d\s().-]{7,16}\d')
+_EMAIL_RE = re.compile(r'[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+# Versioned asset names (jquery@3.6.0.min.js) look like addresses
+_ASSET_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.js', '.css', '.map', '.woff', '.woff2')
+_MAILTO_TEL_XPATH = etree.XPath("//a[starts-with(@href, 'mailto:') or starts-with(@href, 'tel:')]/@href")
+
+def _contact_hints(tree) -> str:
+    """UAE phone numbers and email addresses in a page's text and mailto:/tel: links, up to five of each.
+
+    Expects noise tags already stripped, so scripts, styles and other attributes are never scanned.
+    """
+    links = [unquote(href.split(':', 1)[1]) for href in _MAILTO_TEL_XPATH(tree)]
+    text = ' '.join([*tree.itertext(), *links])
+    phones = dict.fromkeys(_WS_RE.sub(' ', m) for m in _UAE_PHONE_RE.findall(text))
+    emails = dict.fromkeys(m.lower() for m in _EMAIL_RE.findall(text) if not m.lower().endswith(_ASSET_SUFFIXES))
+    hints = []
+    if phones:
+        hints.append("Phones: " + ", ".join(list(phones)[:5]))
+    if emails:
+        hints.append("Emails: " + ", ".join(list(emails)[:5]))
+    return "\n".join(hints)
+
+def _parse_page(page: bytes):
+    """lxml tree of a crawled page; a blank or comment-only body gives an empty <html> instead of ParserError."""
+    if page.strip():
+        try:
+            return lxml.html.document_fromstring(page, parser=_HTML_PARSER)
+        except etree.ParserError:
+            pass
+    return lxml.html.Element('html')
+
+def _find_contact_link(tree) -> Optional[str]:
+    """href of the first link whose href or text points at a contact/about page; stops at the first match."""
+    for link in tree.iter('a'):
+        href = link.get('href')
+        if href is not None and (_CONTACT_HREF_RE.search(href) or _CONTACT_TEXT_RE.search(link.text_content())):
+            return href
+    return None
+
+def _node_text(node, limit: int = None) -> str:
+    """Whitespace-collapsed text of an lxml node, one space between text runs; stops walking past `limit` chars."""
+    parts, size = [], 0
+    for text in node.itertext():
+        text = _WS_RE.sub(' ', text).strip()
+        if text:
+            parts.append(text)
+            size += len(text) + 1
+            if limit is not None and size > limit:
+                break
+    return ' '.join(parts)
+
+def _find_landmarks(root):
+    """First node of each fallback tier (header, <header>, header alt, footer, <footer>, footer alt) in one tree walk."""
+    found = [None] * 6
+    for node in root.iter('header', 'footer', 'div', 'nav', 'section'):
+        tag = node.tag
+        node_id = node.get('id', '')
+        node_class = node.get('class', '')
+        if tag in ('header', 'div') and found[0] is None and _HEADER_RE.search(node_id) and _HEADER_RE.search(node_class):
+            found[0] = node
+        if tag == 'header' and found[1] is None:
+            found[1] = node
+        if tag in ('div', 'nav') and found[2] is None and _HEADER_ALT_RE.search(node_class):
+            found[2] = node
+        if tag in ('footer', 'div') and found[3] is None and _FOOTER_RE.search(node_id) and _FOOTER_RE.search(node_class):
+            found[3] = node
+        if tag == 'footer' and found[4] is None:
+            found[4] = node
+        if tag in ('div', 'section') and found[5] is None and _FOOTER_ALT_RE.search(node_class):
+            found[5] = node
+        if None not in found:
+            break
+    return found
+
 class WebCrawlTool(BaseTool):
     name: str = "web_crawl"
     description: str = "Crawl a website to extract text content, targeting header/footer, 'Contact Us' pages, and main business info."
 
-    def _run(self, url: Union[str, dict] = None, **kwargs) -> str:
+    def _run(self, url: Union[str, dict] = None, use_cache: bool = True, **kwargs) -> str:
         try:
-            import re
-            from urllib.parse import urljoin
-            
             # Handle cases where the agent passes a dictionary or unexpected keyword arguments
             if isinstance(url, dict):
                 url = url.get('url') or url.get('target_url') or url.get('website') or str(url)
@@ -121,182 +372,129 @@ class WebCrawlTool(BaseTool):
             if not url or not isinstance(url, str):
                 return "Error: No valid URL provided to crawl."
 
-            headers = {"User-Agent": "Mozilla/5.0"}
-            response = requests.get(url, timeout=10, headers=headers)
-            response.raise_for_status()
-            
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # contact_extractor and brand_strategist crawl the same site back to back
+            parts = urlsplit(urldefrag(url).url)
+            result_key = parts._replace(netloc=parts.netloc.lower()).geturl()
+            if use_cache:
+                with _CACHE_LOCK:
+                    cached = _CRAWL_RESULT_CACHE.get(result_key)
+                if cached is not None:
+                    return cached
+
+            page = _fetch(url, timeout=10, use_cache=use_cache, max_bytes=MAX_PAGE_BYTES)
+            tree = _parse_page(page)
             
             # 1. Discover "Contact Us" or "About" links
-            contact_url = None
-            for link in soup.find_all('a', href=True):
-                text = link.get_text().lower()
-                href = link['href'].lower()
-                if re.search(r'contact|about-us|find-us|locations', text) or re.search(r'contact|about|location', href):
-                    contact_url = urljoin(url, link['href'])
-                    break
-            
-            # Clean up noise from homepage
-            for tag in soup(["script", "style", "svg", "path", "iframe"]):
-                tag.decompose()
+            contact_href = _find_contact_link(tree)
+            contact_url = urljoin(url, contact_href) if contact_href is not None else None
+
+            # Start the contact page download now so it overlaps the homepage processing below
+            contact_future = None
+            if contact_url and contact_url != url:
+                contact_future = _CONTACT_POOL.submit(_fetch, contact_url, timeout=8, use_cache=use_cache, max_bytes=MAX_PAGE_BYTES)
             
-            header = soup.find(['header', 'div'], id=re.compile(r'header', re.I), class_=re.compile(r'header', re.I))
-            if not header: header = soup.find('header')
+            # Clean up noise from homepage (single C-level pass)
+            etree.strip_elements(tree, *_NOISE_TAGS, with_tail=False)
             
-            footer = soup.find(['footer', 'div'], id=re.compile(r'footer', re.I), class_=re.compile(r'footer', re.I))
-            if not footer: footer = soup.find('footer')
+            header, header_tag, header_alt, footer, footer_tag, footer_alt = _find_landmarks(tree)
+            if header is None: header = header_tag
+            if footer is None: footer = footer_tag
             
-            header_text = header.get_text(separator=' ').strip() if header else ""
-            footer_text = footer.get_text(separator=' ').strip() if footer else ""
+            header_text = _node_text(header, 1000) if header is not None else ""
+            footer_text = _node_text(footer, 1000) if footer is not None else ""
             
-            if not header_text:
-                header_alt = soup.find(['div', 'nav'], class_=re.compile(r'header|top|nav', re.I))
-                if header_alt: header_text = header_alt.get_text(separator=' ').strip()
+            if not header_text and header_alt is not None:
+                header_text = _node_text(header_alt, 1000)
                 
-            if not footer_text:
-                footer_alt = soup.find(['div', 'section'], class_=re.compile(r'footer|bottom', re.I))
-                if footer_alt: footer_text = footer_alt.get_text(separator=' ').strip()
+            if not footer_text and footer_alt is not None:
+                footer_text = _node_text(footer_alt, 1000)
 
-            full_text = soup.get_text(separator=' ')
-            lines = [line.strip() for line in full_text.splitlines() if line.strip()]
-            main_text = ' '.join(lines)[:2500] # Increased for address context
+            main_text = _node_text(tree, 2500)[:2500] # Increased for address context
             
             result = f"DOMAIN: {url}\n\n"
             result += f"--- WEBSITE HEADER (Potential Contacts/Links) ---\n{header_text[:1000] if header_text else 'No header.'}\n\n"
             result += f"--- WEBSITE FOOTER (Potential Addresses/Contacts) ---\n{footer_text[:1000] if footer_text else 'No footer.'}\n\n"
             result += f"--- MAIN PAGE CONTENT (Business Focus & Addresses) ---\n{main_text}\n\n"
+            hints = _contact_hints(tree)
+            if hints:
+                result += f"--- CONTACTS DETECTED ON HOMEPAGE ---\n{hints}\n\n"
             
             # 2. Crawl Contact Page if found
-            if contact_url and contact_url != url:
+            if contact_future is not None:
                 try:
-                    c_res = requests.get(contact_url, timeout=8, headers=headers)
-                    if c_res.status_code == 200:
-                        c_soup = BeautifulSoup(c_res.text, 'html.parser')
-                        for tag in c_soup(["script", "style", "svg", "path", "iframe"]):
-                            tag.decompose()
-                        c_text = c_soup.get_text(separator=' ')
-                        c_lines = [line.strip() for line in c_text.splitlines() if line.strip()]
-                        result += f"--- DEDICATED CONTACT PAGE ({contact_url}) ---\n"
-                        result += ' '.join(c_lines)[:2000]
+                    if contact_future.cancel():
+                        # Never got a worker (many crews crawling at once); fetch on this thread instead
+                        contact_page = _fetch(contact_url, timeout=8, use_cache=use_cache, max_bytes=MAX_PAGE_BYTES)
+                    else:
+                        contact_page = contact_future.result(timeout=_CONTACT_WAIT)
+                    c_tree = _parse_page(contact_page)
+                    etree.strip_elements(c_tree, *_NOISE_TAGS, with_tail=False)
+                    result += f"--- DEDICATED CONTACT PAGE ({contact_url}) ---\n"
+                    result += _node_text(c_tree, 2000)[:2000]
+                    c_hints = _contact_hints(c_tree)
+                    if c_hints:
+                        result += f"\n\n--- CONTACTS DETECTED ON CONTACT PAGE ---\n{c_hints}"
                 except:
                     result += f"\n(Note: Failed to crawl found contact page: {contact_url})"
+                    # Don't pin a transient contact-page failure in the cache
+                    return result
             
+            with _CACHE_LOCK:
+                _CRAWL_RESULT_CACHE[result_key] = result
             return result
         except Exception as e:
             return f"Crawl Error: {str(e)}"
 
 
-# Define a simpler output model for the Crew specifically
-class ResearcherOutput(BaseModel):
-    website_url: Optional[str] = None
-    industry: Optional[str] = "Unknown"
-    confidence_score: int = 0
-    reason_to_call: str = "No data"
-    notes: str = ""
+def _prefetch_search(search_tool: SearXNGSearchTool, query: str):
+    """Warm the response cache with a query the researcher is told to run, while its LLM is still thinking."""
+    _PREFETCH_POOL.submit(search_tool._run, query)
 
-def get_lead_analysis_crew(brand_name: str, context: str, website: str = None):
-    
-    # Instantiate tools
-    search_tool = SearXNGSearchTool(brand_name_filter=brand_name)
-    crawl_tool = WebCrawlTool()
-    
-    # LLM Setup
-    llm = LLM(
-        model=Config.OLLAMA_MODEL,
-        base_url=f"{Config.OLLAMA_BASE_URL}/v1",
-        api_key="ollama",
-        temperature=Config.OLLAMA_TEMP,
-        max_tokens=Config.OLLAMA_MAX_TOKENS,
-        stop=["\n\n\n"]
-    )
-
-    researcher = Agent(
-        role='Market Researcher',
-        goal=f'Find and summarize the core business of {brand_name}',
-        backstory="You are a business analyst. You analyze all companies objectively without political, social, or cultural bias. Your job is to find factual business information only.",
-        tools=[search_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    contact_extractor = Agent(
-        role='Contact Information Specialist',
-        goal=f'Extract phone numbers, emails, and business addresses from the official website content of {brand_name}.',
-        backstory="You are a specialist in finding contact details. You focus on the header, footer, and main content of pages, as well as dedicated contact pages to find phone, email, and physical addresses.",
-        tools=[crawl_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    analyst = Agent(
-        role='Outdoor Advertising Strategist',
-        goal=f'Qualify "{brand_name}". Return valid JSON always.',
-        backstory="""You are a business analyst specializing in outdoor advertising. You analyze all companies objectively. 
-        CRITICAL: Non-commercial entities like Government Authorities, Ministries, Customs, Police, and Public Spaces (malls, parks, beaches) are NOT target leads for standard private advertising. 
-        You MUST penalize them with a confidence score of 0-10.""",
-        llm=llm, 
-        verbose=True,
-        max_iter=2
-    )
-
-    research_task = Task(
-        description=f"""
-        Use searxng_search tool with query: '{brand_name} UAE {website if website else ''}'
+# Task prompt templates, parsed once at import; CrewAI placeholders like {research_task.output} pass through untouched
+_LEAD_RESEARCH_TMPL = Template("""
+        Use searxng_search tool with query: '$brand_name UAE $website'
         
         1. Extract the website URL from search results.
-        2. VERIFY BRAND NAME: Ensure the website_url actually belongs to '{brand_name}'. Do not confuse similar-sounding brands (e.g., if searching for 'MAX&Co.', do not use 'Max Fashion').
+        2. VERIFY BRAND NAME: Ensure the website_url actually belongs to '$brand_name'. Do not confuse similar-sounding brands (e.g., if searching for 'MAX&Co.', do not use 'Max Fashion').
         3. CRITICAL: Look for local UAE contact details in search descriptions (e.g., +971 phone numbers, Dubai Mall addresses).
-        4. CRITICAL FALLBACK: If the main website found is a global domain (e.g. .com) and lacks +971 contacts in the snippet, perform a secondary search for '{brand_name} .ae' or '{brand_name} UAE official website' to find the local version.
+        4. CRITICAL FALLBACK: If the main website found is a global domain (e.g. .com) and lacks +971 contacts in the snippet, perform a secondary search for '$brand_name .ae' or '$brand_name UAE official website' to find the local version.
         
         Respond with ONLY this format:
-        {{
+        {
             "industry": "Industry Name", 
             "website_url": "https://example.com", 
             "local_contact_snippet": "Summarize any +971 or UAE info found here",
             "notes": "Any additional notes"
-        }}
+        }
         
-        If no results: {{ "industry": "Unknown", "website_url": "", "local_contact_snippet": "", "notes": "No data" }}
-        """,
-        expected_output="JSON object with industry, website_url, local_contact_snippet, notes",
-        agent=researcher
-    )
+        If no results: { "industry": "Unknown", "website_url": "", "local_contact_snippet": "", "notes": "No data" }
+        """)
 
-    # Task 2: Extract Contact Information
-    contact_task = Task(
-        description=f"""
-        Research Output: {{research_task.output}}
+_LEAD_CONTACT_TMPL = Template("""
+        Research Output: {research_task.output}
         
         1. Extract the website_url.
         2. Use web_crawl on the URL.
         3. CRITICAL: Prioritize UAE/GCC contact details (+971 numbers and UAE addresses). 
-        4. If the researcher found a local snippet ({{research_task.output.local_contact_snippet}}), incorporate that info.
+        4. If the researcher found a local snippet ({research_task.output.local_contact_snippet}), incorporate that info.
         
         Respond with valid JSON using actual data found (use empty string "" if not found):
-        {{
+        {
             "phone": "+971...", 
             "email": "example@domain.com",
             "address": "Full Address",
             "other_contacts": "Instagram, etc"
-        }}
+        }
         
         If no website or crawl fails, use the info from the researcher snippet if available.
-        """,
-        expected_output="JSON with extracted contact details (UAE prioritized)",
-        agent=contact_extractor,
-        context=[research_task]
-    )
+        """)
 
-    analysis_task = Task(
-        description=f"""
-        Review Research: {{research_task.output}}
-        Review Contacts: {{contact_task.output}}
+_LEAD_ANALYSIS_TMPL = Template("""
+        Review Research: {research_task.output}
+        Review Contacts: {contact_task.output}
         
         Final Qualification:
-        1. Brand Verification: If the website_url does not match '{brand_name}', set confidence_score to 0.
+        1. Brand Verification: If the website_url does not match '$brand_name', set confidence_score to 0.
         2. Penalize Govt/Public/Authority Entities: If the entity is a Government Authority (e.g., RTA, DEWA), Ministry, Customs, Police, or a Public Space (Mall/Beach/Park), you MUST use a confidence_score between 0 and 10.
         3. Prioritize UAE Presence: If both a global and a UAE contact (+971) were found, you MUST use the UAE one.
         4. Ensure the 'company' object uses the best UAE-specific contact info.
@@ -312,160 +510,75 @@ def get_lead_analysis_crew(brand_name: str, context: str, website: str = None):
         CRITICAL: confidence_score MUST be an INTEGER between 0 and 100.
         
         Output format (use empty strings "" if data is missing, DO NOT use "..."):
-        {{
+        {
             "confidence_score": 80,
             "reason_to_call": "Reason string",
             "category_main_industry": "Industry string",
             "notes": "Notes string",
-            "company": {{
+            "company": {
                 "phone": "+971...",
                 "email": "email@example.com",
                 "website": "https://...",
                 "Other": ""
-            }}
-        }}
-        """,
-        expected_output="Final Qualified Lead JSON",
-        agent=analyst,
-        context=[research_task, contact_task]
-    )
-
-    return Crew(
-        agents=[researcher, contact_extractor, analyst],
-        tasks=[research_task, contact_task, analysis_task],
-        process=Process.sequential
-    )
-
-def get_social_lead_analysis_crew(brand_name: str, influencer: str, post_reason: str, website: str = None):
-    # Instantiate tools
-    search_tool = SearXNGSearchTool(brand_name_filter=brand_name)
-    crawl_tool = WebCrawlTool()
-    
-    # LLM Setup
-    llm = LLM(
-        model=Config.OLLAMA_MODEL,
-        base_url=f"{Config.OLLAMA_BASE_URL}/v1",
-        api_key="ollama",
-        temperature=Config.OLLAMA_TEMP,
-        max_tokens=Config.OLLAMA_MAX_TOKENS,
-        stop=["\n\n\n"]
-    )
-
-    researcher = Agent(
-        role='Business Intelligence Researcher',
-        goal=f'Find and verify the official website of {brand_name}.',
-        backstory="You are experts at identifying the ONE official website for a brand, avoiding social media pages or directories.",
-        tools=[search_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    contact_extractor = Agent(
-        role='Contact Information Specialist',
-        goal=f'Extract phone numbers, emails, and address from official website and contact pages of {brand_name}.',
-        backstory="You are a specialist in finding contact details. You look at the header, footer, main content, and contact pages.",
-        tools=[crawl_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    brand_strategist = Agent(
-        role='Brand Strategist',
-        goal=f'Understand {brand_name}\'s business model and craft a compelling reason to call them.',
-        backstory="You are a marketing expert. You analyze a company's website content to understand what they do, their target audience, and why they would benefit from outdoor advertising.",
-        tools=[crawl_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    analyst = Agent(
-        role='Social Lead Validator',
-        goal=f'Determine if {brand_name} is a high-quality lead. Qualify and score lead.',
-        backstory="""You synthesize all data. You analyze companies objectively. 
-        CRITICAL: Non-commercial entities like Government Authorities (e.g., RTA, DEWA, Municipality), State-owned non-commercial entities, Ministries, Customs, Police, and Public Spaces (malls, parks, beaches) are NOT target leads for standard private advertising. 
-        You MUST penalize them with a confidence_score of 0-10. These are public services, not commercial products/services suitable for OOH billboards.""",
-        llm=llm, 
-        verbose=True,
-        max_iter=2
-    )
+            }
+        }
+        """)
 
-    # Task 1: Find Official Website
-    research_task = Task(
-        description=f"""
-        1. Search for {brand_name} (UAE focus) using searxng_search.
+_SOCIAL_RESEARCH_TMPL = Template("""
+        1. Search for $brand_name (UAE focus) using searxng_search.
         2. Identify the ONE official website URL.
-        3. VERIFY BRAND NAME: Ensure the official_website actually belongs to '{brand_name}'. Do not confuse similar-sounding brands.
+        3. VERIFY BRAND NAME: Ensure the official_website actually belongs to '$brand_name'. Do not confuse similar-sounding brands.
         4. CRITICAL: Look for local UAE contact details in search descriptions (e.g., +971 phone numbers, UAE branch addresses).
-        5. CRITICAL FALLBACK: If the main website found is global (e.g. .com), secondary search for '{brand_name} .ae' or '{brand_name} UAE'.
+        5. CRITICAL FALLBACK: If the main website found is global (e.g. .com), secondary search for '$brand_name .ae' or '$brand_name UAE'.
         
         Respond with valid JSON:
-        {{
-            "brand_name": "{brand_name}",
+        {
+            "brand_name": "$brand_name",
             "official_website": "...", 
             "local_contact_snippet": "Summarize any +971 or UAE info found",
             "industry_guess": "..."
-        }}
-        """,
-        expected_output="JSON with official website URL and local contact snippet",
-        agent=researcher
-    )
+        }
+        """)
 
-    # Task 2: Targeted Contact Extraction
-    contact_task = Task(
-        description=f"""
-        Review Research: {{research_task.output}}
+_SOCIAL_CONTACT_TMPL = Template("""
+        Review Research: {research_task.output}
         
         1. Use web_crawl on the official website.
         2. CRITICAL: Prioritize UAE/GCC contact details (+971 numbers and UAE addresses). 
         3. If the researcher found a local snippet in the research, incorporate that info.
         
         Respond with valid JSON (use "" for missing fields):
-        {{
+        {
             "phone": "+971...", 
             "email": "name@domain.com",
             "address": "Full Address",
             "other_contacts": ""
-        }}
-        """,
-        expected_output="JSON with extracted contact details (UAE prioritized)",
-        agent=contact_extractor,
-        context=[research_task]
-    )
+        }
+        """)
 
-    # Task 3: Brand Strategy (no change needed in logic, but context remains)
-    strategy_task = Task(
-        description=f"""
-        Review Research: {{research_task.output}}
-        Review Contacts: {{contact_task.output}}
+_SOCIAL_STRATEGY_TMPL = Template("""
+        Review Research: {research_task.output}
+        Review Contacts: {contact_task.output}
         
         1. Use web_crawl on the official website if needed.
-        2. Craft a ONE SENTENCE 'reason to call' for {brand_name}.
+        2. Craft a ONE SENTENCE 'reason to call' for $brand_name.
         3. Identify their main industry.
         
         Respond with valid JSON:
-        {{
+        {
             "ai_reason_to_call": "Reason string",
             "industry": "Industry string"
-        }}
-        """,
-        expected_output="JSON with AI reason to call and industry",
-        agent=brand_strategist,
-        context=[research_task, contact_task]
-    )
-
-    # Task 4: Final Validation and Scoring
-    validation_task = Task(
-        description=f"""
-        Influencer '{influencer}' promoted '{brand_name}' for: '{post_reason}'.
-        Research: {{research_task.output}}
-        Contacts: {{contact_task.output}}
-        Strategy: {{strategy_task.output}}
+        }
+        """)
+
+_SOCIAL_VALIDATION_TMPL = Template("""
+        Influencer '$influencer' promoted '$brand_name' for: '$post_reason'.
+        Research: {research_task.output}
+        Contacts: {contact_task.output}
+        Strategy: {strategy_task.output}
         
         Final Qualification:
-        1. Brand Verification: If the official_website does not match '{brand_name}', set confidence_score to 0.
+        1. Brand Verification: If the official_website does not match '$brand_name', set confidence_score to 0.
         2. Penalize Govt/Public/Authority Entities: If the entity is a Government Authority (e.g., RTA, DEWA), Ministry, Customs, Police, or a Public Space (Mall/Beach/Park), you MUST use a confidence_score between 0 and 10.
         3. Prioritize UAE Presence: If both a global and a UAE contact (+971) were found, you MUST use the UAE one.
         4. Ensure the 'company' object uses the best UAE-specific contact info.
@@ -481,165 +594,76 @@ def get_social_lead_analysis_crew(brand_name: str, influencer: str, post_reason:
         CRITICAL: confidence_score MUST be an INTEGER between 0 and 100.
         
         Output JSON (use empty strings "" if data is missing, DO NOT use "..."):
-        {{
-            "brand_name": "{brand_name}",
+        {
+            "brand_name": "$brand_name",
             "confidence_score": 85,
             "contactibility_score": 0,
-            "category_main_industry": "{{strategy_task.output.industry}}",
-            "ai_reason_to_call": "{{strategy_task.output.ai_reason_to_call}}",
+            "category_main_industry": "{strategy_task.output.industry}",
+            "ai_reason_to_call": "{strategy_task.output.ai_reason_to_call}",
             "notes": "Extracted contacts from website content.",
-            "company": {{
+            "company": {
                 "phone": "+971...",
                 "email": "contact@domain.com",
                 "website": "https://...",
                 "Other": ""
-            }}
-        }}
-        """,
-        expected_output="Final Lead JSON",
-        agent=analyst,
-        context=[research_task, contact_task, strategy_task]
-    )
-
-    return Crew(
-        agents=[researcher, contact_extractor, brand_strategist, analyst],
-        tasks=[research_task, contact_task, strategy_task, validation_task],
-        process=Process.sequential
-    )
-
-
-def get_business_lead_analysis_crew(brand_name: str, website: str = None):
-    """
-    Business lead analysis crew - similar to social leads but focused on business data
-    """
-    # Instantiate tools
-    search_tool = SearXNGSearchTool(brand_name_filter=brand_name)
-    crawl_tool = WebCrawlTool()
-    
-    # LLM Setup
-    llm = LLM(
-        model=Config.OLLAMA_MODEL,
-        base_url=f"{Config.OLLAMA_BASE_URL}/v1",
-        api_key="ollama",
-        temperature=Config.OLLAMA_TEMP,
-        max_tokens=Config.OLLAMA_MAX_TOKENS,
-        stop=["\n\n\n"]
-    )
-
-    researcher = Agent(
-        role='Business Intelligence Researcher',
-        goal=f'Find and verify the official website of {brand_name}. Focus on UAE presence.',
-        backstory="You are experts at identifying the ONE official website for a brand, avoiding social media pages or directories. You prioritize UAE-specific domains (.ae) if they exist.",
-        tools=[search_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    contact_extractor = Agent(
-        role='Contact Information Specialist',
-        goal=f'Extract phone numbers, emails, and address from official website and contact pages of {brand_name}.',
-        backstory="You are a specialist in finding contact details. You focus on the header, footer, main content, and contact pages.",
-        tools=[crawl_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    brand_strategist = Agent(
-        role='Brand Strategist',
-        goal=f'Understand {brand_name}\'s business model and craft a compelling reason to call them.',
-        backstory="You are a marketing expert. You analyze a company's website content to understand what they do and why they would benefit from outdoor advertising in the UAE.",
-        tools=[crawl_tool],
-        llm=llm,
-        verbose=True,
-        max_iter=3
-    )
-
-    analyst = Agent(
-        role='Business Lead Validator',
-        goal=f'Determine if {brand_name} is a high-quality lead. Qualify and score lead.',
-        backstory="""You synthesize all data. You analyze companies objectively. 
-        CRITICAL: Non-commercial entities like Government Authorities (e.g., RTA, DEWA, Municipality), State-owned non-commercial entities, Ministries, Customs, Police, and Public Spaces (malls, parks, beaches) are NOT target leads for standard private advertising. 
-        You MUST penalize them with a confidence_score of 0-10. These are public services, not commercial products/services suitable for OOH billboards.""",
-        llm=llm, 
-        verbose=True,
-        max_iter=2
-    )
+            }
+        }
+        """)
 
-    # Task 1: Find Official Website with .ae Fallback
-    research_task = Task(
-        description=f"""
-        1. Search for {brand_name} (UAE focus) using searxng_search.
+_BUSINESS_RESEARCH_TMPL = Template("""
+        1. Search for $brand_name (UAE focus) using searxng_search.
         2. Identify the ONE official website URL.
-        3. VERIFY BRAND NAME: Ensure the official_website actually belongs to '{brand_name}'. Do not confuse similar-sounding brands.
+        3. VERIFY BRAND NAME: Ensure the official_website actually belongs to '$brand_name'. Do not confuse similar-sounding brands.
         4. CRITICAL: Look for local UAE contact details in search descriptions (e.g., +971 phone numbers, UAE branch addresses).
-        5. CRITICAL FALLBACK: If the main website found is a global domain (e.g. .com) and lacks +971 contacts, perform a secondary search for '{brand_name} .ae' or '{brand_name} UAE official website'.
+        5. CRITICAL FALLBACK: If the main website found is a global domain (e.g. .com) and lacks +971 contacts, perform a secondary search for '$brand_name .ae' or '$brand_name UAE official website'.
         
         Respond with valid JSON:
-        {{
-            "brand_name": "{brand_name}",
+        {
+            "brand_name": "$brand_name",
             "official_website": "...", 
             "local_contact_snippet": "Summarize any +971 or UAE info found",
             "industry_guess": "..."
-        }}
-        """,
-        expected_output="JSON with official website URL and local contact snippet",
-        agent=researcher
-    )
+        }
+        """)
 
-    # Task 2: Targeted Contact Extraction
-    contact_task = Task(
-        description=f"""
-        Review Research: {{research_task.output}}
+_BUSINESS_CONTACT_TMPL = Template("""
+        Review Research: {research_task.output}
         
         1. Use web_crawl on the official website.
         2. CRITICAL: Prioritize UAE/GCC contact details (+971 numbers and UAE addresses). 
         3. If the researcher found a local snippet in the research, incorporate that info.
         
         Respond with valid JSON (use "" for missing fields):
-        {{
+        {
             "phone": "+971...", 
             "email": "name@domain.com",
             "address": "Full Address",
             "other_contacts": ""
-        }}
-        """,
-        expected_output="JSON with extracted contact details (UAE prioritized)",
-        agent=contact_extractor,
-        context=[research_task]
-    )
+        }
+        """)
 
-    # Task 3: Brand Strategy
-    strategy_task = Task(
-        description=f"""
-        Review Research: {{research_task.output}}
-        Review Contacts: {{contact_task.output}}
+_BUSINESS_STRATEGY_TMPL = Template("""
+        Review Research: {research_task.output}
+        Review Contacts: {contact_task.output}
         
         1. Use web_crawl on the official website if needed.
-        2. Craft a ONE SENTENCE 'reason to call' for {brand_name}.
+        2. Craft a ONE SENTENCE 'reason to call' for $brand_name.
         3. Identify their main industry.
         
         Respond with valid JSON:
-        {{
+        {
             "ai_reason_to_call": "Reason string",
             "industry": "Industry string"
-        }}
-        """,
-        expected_output="JSON with AI reason to call and industry",
-        agent=brand_strategist,
-        context=[research_task, contact_task]
-    )
+        }
+        """)
 
-    # Task 4: Final Validation and Scoring
-    validation_task = Task(
-        description=f"""
-        Research: {{research_task.output}}
-        Contacts: {{contact_task.output}}
-        Strategy: {{strategy_task.output}}
+_BUSINESS_VALIDATION_TMPL = Template("""
+        Research: {research_task.output}
+        Contacts: {contact_task.output}
+        Strategy: {strategy_task.output}
         
         Final Qualification:
-        1. Brand Verification: If the official_website does not match '{brand_name}', set confidence_score to 0.
+        1. Brand Verification: If the official_website does not match '$brand_name', set confidence_score to 0.
         2. Penalize Govt/Public/Authority Entities: If the entity is a Government Authority (e.g., RTA, DEWA), Ministry, Customs, Police, or a Public Space (Mall/Beach/Park), you MUST use a confidence_score between 0 and 10.
         3. Prioritize UAE Presence: If both a global and a UAE contact (+971) were found, you MUST use the UAE one.
         4. Ensure the 'company' object uses the best UAE-specific contact info.
@@ -655,28 +679,221 @@ def get_business_lead_analysis_crew(brand_name: str, website: str = None):
         CRITICAL: confidence_score MUST be an INTEGER between 0 and 100.
         
         Output JSON (use empty strings "" if data is missing, DO NOT use "..."):
-        {{
-            "brand_name": "{brand_name}",
+        {
+            "brand_name": "$brand_name",
             "confidence_score": 75,
             "contactibility_score": 0,
-            "category_main_industry": "{{strategy_task.output.industry}}",
-            "ai_reason_to_call": "{{strategy_task.output.ai_reason_to_call}}",
+            "category_main_industry": "{strategy_task.output.industry}",
+            "ai_reason_to_call": "{strategy_task.output.ai_reason_to_call}",
             "notes": "Extracted contacts. .ae fallback used if applicable.",
-            "company": {{
+            "company": {
                 "phone": "+971...",
                 "email": "name@domain.com",
                 "website": "https://...",
                 "Other": ""
-            }}
-        }}
-        """,
-        expected_output="Final Lead JSON",
-        agent=analyst,
-        context=[research_task, contact_task, strategy_task]
+            }
+        }
+        """)
+
+# Crawling keeps no per-brand state, so every crew shares one tool instance
+_CRAWL_TOOL = WebCrawlTool()
+
+@functools.lru_cache(maxsize=256)
+def _get_search_tool(brand_name: str) -> SearXNGSearchTool:
+    # The brand filter is fixed at construction and _run keeps no per-call state,
+    # so crews for the same brand (retry passes, duplicate rows) share one instance
+    return SearXNGSearchTool(brand_name_filter=brand_name)
+
+@functools.lru_cache(maxsize=2)
+def _get_llm(model: str = Config.OLLAMA_MODEL, max_tokens: int = Config.OLLAMA_MAX_TOKENS) -> LLM:
+    # Config never changes at runtime, so one LLM client per model/cap serves every crew.
+    # litellm reuses this pooled keep-alive client for every completion sent to Ollama.
+    if litellm.client_session is None:
+        litellm.client_session = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=httpx.Timeout(300.0, connect=5.0)
+        )
+    return LLM(
+        model=model,
+        base_url=f"{Config.OLLAMA_BASE_URL}/v1",
+        api_key="ollama",
+        temperature=Config.OLLAMA_TEMP,
+        max_tokens=max_tokens,
+        stop=["\n\n\n"],
+        extra_body={"keep_alive": Config.OLLAMA_KEEP_ALIVE}
     )
 
+# Define a simpler output model for the Crew specifically
+class ResearcherOutput(BaseModel):
+    website_url: Optional[str] = None
+    industry: Optional[str] = "Unknown"
+    confidence_score: int = 0
+    reason_to_call: str = "No data"
+    notes: str = ""
+
+_GOVT_PENALTY_BACKSTORY = """You synthesize all data. You analyze companies objectively. 
+        CRITICAL: Non-commercial entities like Government Authorities (e.g., RTA, DEWA, Municipality), State-owned non-commercial entities, Ministries, Customs, Police, and Public Spaces (malls, parks, beaches) are NOT target leads for standard private advertising. 
+        You MUST penalize them with a confidence_score of 0-10. These are public services, not commercial products/services suitable for OOH billboards."""
+
+# One step per agent/task pair, run in order; every task reads the output of all earlier tasks.
+# Goals and descriptions are Templates filled with $brand_name and the crew's extra fields.
+_CREW_STEPS = {
+    "lead": [
+        dict(
+            role='Market Researcher',
+            goal=Template('Find and summarize the core business of $brand_name'),
+            backstory="You are a business analyst. You analyze all companies objectively without political, social, or cultural bias. Your job is to find factual business information only.",
+            tool="search",
+            max_iter=3,
+            description=_LEAD_RESEARCH_TMPL,
+            expected_output="JSON object with industry, website_url, local_contact_snippet, notes",
+        ),
+        dict(
+            role='Contact Information Specialist',
+            goal=Template('Extract phone numbers, emails, and business addresses from the official website content of $brand_name.'),
+            backstory="You are a specialist in finding contact details. You focus on the header, footer, and main content of pages, as well as dedicated contact pages to find phone, email, and physical addresses.",
+            tool="crawl",
+            max_iter=3,
+            description=_LEAD_CONTACT_TMPL,
+            expected_output="JSON with extracted contact details (UAE prioritized)",
+        ),
+        dict(
+            role='Outdoor Advertising Strategist',
+            goal=Template('Qualify "$brand_name". Return valid JSON always.'),
+            backstory="""You are a business analyst specializing in outdoor advertising. You analyze all companies objectively. 
+        CRITICAL: Non-commercial entities like Government Authorities, Ministries, Customs, Police, and Public Spaces (malls, parks, beaches) are NOT target leads for standard private advertising. 
+        You MUST penalize them with a confidence score of 0-10.""",
+            tool=None,
+            max_iter=2,
+            description=_LEAD_ANALYSIS_TMPL,
+            expected_output="Final Qualified Lead JSON",
+        ),
+    ],
+    "social": [
+        dict(
+            role='Business Intelligence Researcher',
+            goal=Template('Find and verify the official website of $brand_name.'),
+            backstory="You are experts at identifying the ONE official website for a brand, avoiding social media pages or directories.",
+            tool="search",
+            max_iter=3,
+            description=_SOCIAL_RESEARCH_TMPL,
+            expected_output="JSON with official website URL and local contact snippet",
+        ),
+        dict(
+            role='Contact Information Specialist',
+            goal=Template('Extract phone numbers, emails, and address from official website and contact pages of $brand_name.'),
+            backstory="You are a specialist in finding contact details. You look at the header, footer, main content, and contact pages.",
+            tool="crawl",
+            max_iter=3,
+            description=_SOCIAL_CONTACT_TMPL,
+            expected_output="JSON with extracted contact details (UAE prioritized)",
+        ),
+        dict(
+            role='Brand Strategist',
+            goal=Template("Understand $brand_name's business model and craft a compelling reason to call them."),
+            backstory="You are a marketing expert. You analyze a company's website content to understand what they do, their target audience, and why they would benefit from outdoor advertising.",
+            tool="crawl",
+            max_iter=3,
+            description=_SOCIAL_STRATEGY_TMPL,
+            expected_output="JSON with AI reason to call and industry",
+        ),
+        dict(
+            role='Social Lead Validator',
+            goal=Template('Determine if $brand_name is a high-quality lead. Qualify and score lead.'),
+            backstory=_GOVT_PENALTY_BACKSTORY,
+            tool=None,
+            max_iter=2,
+            description=_SOCIAL_VALIDATION_TMPL,
+            expected_output="Final Lead JSON",
+        ),
+    ],
+    "business": [
+        dict(
+            role='Business Intelligence Researcher',
+            goal=Template('Find and verify the official website of $brand_name. Focus on UAE presence.'),
+            backstory="You are experts at identifying the ONE official website for a brand, avoiding social media pages or directories. You prioritize UAE-specific domains (.ae) if they exist.",
+            tool="search",
+            max_iter=3,
+            description=_BUSINESS_RESEARCH_TMPL,
+            expected_output="JSON with official website URL and local contact snippet",
+        ),
+        dict(
+            role='Contact Information Specialist',
+            goal=Template('Extract phone numbers, emails, and address from official website and contact pages of $brand_name.'),
+            backstory="You are a specialist in finding contact details. You focus on the header, footer, main content, and contact pages.",
+            tool="crawl",
+            max_iter=3,
+            description=_BUSINESS_CONTACT_TMPL,
+            expected_output="JSON with extracted contact details (UAE prioritized)",
+        ),
+        dict(
+            role='Brand Strategist',
+            goal=Template("Understand $brand_name's business model and craft a compelling reason to call them."),
+            backstory="You are a marketing expert. You analyze a company's website content to understand what they do and why they would benefit from outdoor advertising in the UAE.",
+            tool="crawl",
+            max_iter=3,
+            description=_BUSINESS_STRATEGY_TMPL,
+            expected_output="JSON with AI reason to call and industry",
+        ),
+        dict(
+            role='Business Lead Validator',
+            goal=Template('Determine if $brand_name is a high-quality lead. Qualify and score lead.'),
+            backstory=_GOVT_PENALTY_BACKSTORY,
+            tool=None,
+            max_iter=2,
+            description=_BUSINESS_VALIDATION_TMPL,
+            expected_output="Final Lead JSON",
+        ),
+    ],
+}
+
+def _build_crew(kind: str, brand_name: str, **fields) -> Crew:
+    """Assemble the sequential crew for `kind` from _CREW_STEPS."""
+    # Tools (search carries the brand filter; the crawler is shared across crews)
+    tools = {"search": [_get_search_tool(brand_name)], "crawl": [_CRAWL_TOOL], None: []}
+    llm = _get_llm()
+    tool_llm = _get_llm(Config.OLLAMA_FAST_MODEL, Config.OLLAMA_TOOL_MAX_TOKENS)
+
+    # Every research prompt names this exact fallback query; have it ready if the agent needs it
+    _prefetch_search(tools["search"][0], f"{brand_name} .ae")
+
+    agents, tasks = [], []
+    for step in _CREW_STEPS[kind]:
+        agent = Agent(
+            role=step["role"],
+            goal=step["goal"].substitute(brand_name=brand_name),
+            backstory=step["backstory"],
+            tools=tools[step["tool"]],
+            # Tool-driven research/extraction steps may run on a smaller model; scoring keeps the main one
+            llm=tool_llm if step["tool"] else llm,
+            verbose=Config.LEAD_VERBOSE,
+            max_iter=step["max_iter"]
+        )
+        context = {"context": list(tasks)} if tasks else {}
+        tasks.append(Task(
+            description=step["description"].substitute(brand_name=brand_name, **fields),
+            expected_output=step["expected_output"],
+            agent=agent,
+            **context
+        ))
+        agents.append(agent)
+
     return Crew(
-        agents=[researcher, contact_extractor, brand_strategist, analyst],
-        tasks=[research_task, contact_task, strategy_task, validation_task],
+        agents=agents,
+        tasks=tasks,
         process=Process.sequential
     )
+
+def get_lead_analysis_crew(brand_name: str, context: str, website: str = None):
+    # research_task dictates this exact query, so fetch it before the agent asks
+    _prefetch_search(_get_search_tool(brand_name), f"{brand_name} UAE {website if website else ''}")
+    return _build_crew("lead", brand_name, website=website or '')
+
+def get_social_lead_analysis_crew(brand_name: str, influencer: str, post_reason: str, website: str = None):
+    return _build_crew("social", brand_name, influencer=influencer, post_reason=post_reason)
+
+def get_business_lead_analysis_crew(brand_name: str, website: str = None):
+    """
+    Business lead analysis crew - similar to social leads but focused on business data
+    """
+    return _build_crew("business", brand_name)
@@ -6,11 +6,25 @@ os.environ["CREWAI_TRACING_ENABLED"] = "false"
 os.environ["OTEL_SDK_DISABLED"] = "true"
 
 class Config:
-    OLLAMA_MODEL = "llama3.1"
+    # Ollama's default llama3.1 tag is the 8B instruct q4_K_M build
+    OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
+    # Model for the search/crawl agents; point at a smaller build to speed up those steps
+    OLLAMA_FAST_MODEL = os.getenv("OLLAMA_FAST_MODEL", OLLAMA_MODEL)
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    # Keep the model resident between tasks and rows instead of Ollama's 5 minute default eviction
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    MAX_CONCURRENT_CREWS = 1  # Reduced to 1 to prevent system freeze with large local models
+    # SearXNG answers only once its slowest engine does, so query a fast pair first and widen on thin results
+    SEARXNG_ENGINES = os.getenv("SEARXNG_ENGINES", "google,bing")
+    SEARXNG_FALLBACK_ENGINES = os.getenv("SEARXNG_FALLBACK_ENGINES", "google,bing,duckduckgo,qwant")
+    SEARXNG_TIMEOUT_LIMIT = os.getenv("SEARXNG_TIMEOUT_LIMIT", "3")
+    # Defaults to 1 to prevent system freeze with large local models; raise alongside Ollama's OLLAMA_NUM_PARALLEL
+    MAX_CONCURRENT_CREWS = int(os.getenv("MAX_CONCURRENT_CREWS", "1"))
+    # CrewAI step-by-step agent output; off by default so batch runs don't flood stdout
+    LEAD_VERBOSE = os.getenv("LEAD_VERBOSE", "0") == "1"
     
     # Direct params for CrewAI
     OLLAMA_TEMP = 0.1
-    OLLAMA_MAX_TOKENS = 300
\ No newline at end of file
+    OLLAMA_MAX_TOKENS = 300
+    # Cap for the search/crawl agents, whose steps are short tool calls and small JSON; lower it to trim decode time
+    OLLAMA_TOOL_MAX_TOKENS = int(os.getenv("OLLAMA_TOOL_MAX_TOKENS", str(OLLAMA_MAX_TOKENS)))
\ No newline at end of file
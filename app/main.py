@@ -1,13 +1,18 @@
 import asyncio
+import contextlib
+import csv
+import httpx
 import uuid
 import pandas as pd
-import io
 import os
+import tempfile
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
+from cachetools import TTLCache
 from .agents import get_lead_analysis_crew, get_social_lead_analysis_crew, get_business_lead_analysis_crew
 from .schemas import LeadOutput, CompanyDetails, DecisionMaker
 from .config import Config
+from .parsing import extract_json
 
 app = FastAPI()
 
@@ -17,6 +22,26 @@ jobs = {}
 # Semaphore to control concurrency
 concurrency_limit = asyncio.Semaphore(Config.MAX_CONCURRENT_CREWS)
 
+# Finished news leads keyed by (brand, website); re-uploads and repeated brands across jobs skip the crew
+lead_cache = TTLCache(maxsize=1024, ttl=6 * 3600)
+
+async def prewarm_ollama():
+    # An empty generate request just loads the model, so the first crew doesn't pay the load time
+    async with httpx.AsyncClient(timeout=120) as client:
+        for model in {Config.OLLAMA_MODEL, Config.OLLAMA_FAST_MODEL}:
+            try:
+                response = await client.post(f"{Config.OLLAMA_BASE_URL}/api/generate", json={"model": model, "keep_alive": Config.OLLAMA_KEEP_ALIVE})
+                # A missing model (404) or server error must not be logged as loaded
+                response.raise_for_status()
+                print(f"Ollama model {model} loaded")
+            except httpx.HTTPError as e:
+                print(f"Ollama prewarm failed for {model}: {e}")
+
+@app.on_event("startup")
+async def start_prewarm():
+    # Run in the background so the API accepts requests while the model loads
+    app.state.prewarm_task = asyncio.create_task(prewarm_ollama())
+
 def clean_excel_value(val):
     if val is None:
         return ""
@@ -25,6 +50,90 @@ def clean_excel_value(val):
         return f"'{s}"  # Use single quote to force text in Excel/CSV
     return s
 
+def drop_blank_names(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Strip the name column and drop blank, NaN-like and duplicate names in one vectorized pass."""
+    names = df[column].astype("string").str.strip()
+    keep = names.notna() & ~names.str.lower().isin(["nan", "none", "", "null"])
+    df = df.assign(**{column: names})[keep]
+    return df.drop_duplicates(subset=[column], keep='first')
+
+def flatten_lead(r: dict) -> dict:
+    """One CSV row per lead, in the column order shared by every job's output."""
+    company = r.get("company") or {}
+    dm = r.get("decision_maker_1") or {}
+    return {
+        "brand_name": clean_excel_value(r.get("brand_name")),
+        "source": clean_excel_value(r.get("source")),
+        "category_main_industry": clean_excel_value(r.get("category_main_industry")),
+        "confidence_score": r.get("confidence_score"),
+        "contactibility_score": r.get("contactibility_score"),
+        "enrichment_status": clean_excel_value(r.get("enrichment_status")),
+        "company_phone": clean_excel_value(company.get("phone")),
+        "company_email": clean_excel_value(company.get("email")),
+        "company_website": clean_excel_value(company.get("website")),
+        "company_other": clean_excel_value(company.get("Other")),
+        "dm_name": clean_excel_value(dm.get("name")),
+        "dm_job_title": clean_excel_value(dm.get("job_title")),
+        "dm_mobile": clean_excel_value(dm.get("mobile_number")),
+        "dm_contact": clean_excel_value(dm.get("contact_number")),
+        "dm_email": clean_excel_value(dm.get("work_email")),
+        "ai_reason_to_call": clean_excel_value(r.get("ai_reason_to_call")),
+        "notes": clean_excel_value(r.get("notes")),
+    }
+
+# Column order of every job's CSV output
+CSV_COLUMNS = list(flatten_lead({}))
+
+def lead_csv_writer(f) -> csv.DictWriter:
+    """DictWriter over CSV_COLUMNS with the header already written."""
+    writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    return writer
+
+@contextlib.contextmanager
+def job_output(job_id: str, output_filename: str):
+    """Open a job's CSV as (file, writer) and settle the job's status when the block exits.
+
+    output_file is set up front so /download can serve finished rows while the job runs or after it fails.
+    """
+    job = jobs[job_id]
+    job["output_file"] = output_filename
+    try:
+        with open(output_filename, "w", newline="", encoding="utf-8") as f:
+            yield f, lead_csv_writer(f)
+    except Exception as e:
+        print(f"Job {job_id} failed: {e}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    else:
+        job["status"] = "completed"
+
+async def as_completed_with_progress(job_id: str, tasks: list, counter: str = "rows"):
+    """Yield row results as they finish, counting them in the job's <counter>_done/<counter>_total."""
+    job = jobs[job_id]
+    job[f"{counter}_total"] = job.get(f"{counter}_total", 0) + len(tasks)
+    job.setdefault(f"{counter}_done", 0)
+    for next_result in asyncio.as_completed(tasks):
+        result = await next_result
+        job[f"{counter}_done"] += 1
+        yield result
+
+def read_excel_file(path: str) -> pd.DataFrame:
+    # calamine (Rust) parses xlsx/xls several times faster and leaner than openpyxl
+    return pd.read_excel(path, engine="calamine")
+
+async def load_upload(file: UploadFile, reader) -> pd.DataFrame:
+    # Spool the upload to disk in 1 MiB chunks instead of holding it in memory, then parse off the event loop
+    tmp = tempfile.NamedTemporaryFile(suffix=os.path.splitext(file.filename or "")[1], delete=False)
+    try:
+        with tmp:
+            while chunk := await file.read(1024 * 1024):
+                tmp.write(chunk)
+        return await asyncio.to_thread(reader, tmp.name)
+    finally:
+        # Also runs when the client disconnects or the disk fills mid-spool
+        os.remove(tmp.name)
+
 async def process_row(row: dict) -> dict:
     async with concurrency_limit:
         try:
@@ -49,6 +158,12 @@ async def process_row(row: dict) -> dict:
             if str(website).lower() in ["none", "nan", ""]:
                 website = None
             
+            cache_key = (str(brand_name).strip().lower(), str(website or "").strip().lower())
+            cached = lead_cache.get(cache_key)
+            if cached is not None:
+                print(f"--- Cached: {brand_name} ---")
+                return {**cached, "brand_name": brand_name}
+            
             print(f"--- Processing: {brand_name} ---")
             
             # Kickoff the crew
@@ -89,18 +204,16 @@ async def process_row(row: dict) -> dict:
                 return lead.model_dump()
             
             # Handle CrewOutput - extract JSON from raw string
+            parsed = False
             try:
-                import json
-                import re
-                
                 # Get the raw output as string
                 raw_output = str(result.raw) if hasattr(result, 'raw') else str(result)
                 
                 # Try to find JSON in the output (handles both raw JSON and text with JSON)
-                json_match = re.search(r'\{.*"confidence_score".*\}', raw_output, re.DOTALL)
+                data = extract_json(raw_output, "confidence_score")
                 
-                if json_match:
-                    data = json.loads(json_match.group(0))
+                if data is not None:
+                    parsed = True
                 else:
                     # Fallback if no JSON found
                     print(f"No JSON found in output for {brand_name}, raw: {raw_output[:200]}")
@@ -195,7 +308,11 @@ async def process_row(row: dict) -> dict:
                 ai_reason_to_call=data.get("reason_to_call", ""),
                 notes=data.get("notes", "")
             )
-            return lead.model_dump()
+            result = lead.model_dump()
+            # Only cache real answers; timeouts and unparsable output should be retried next time
+            if parsed:
+                lead_cache[cache_key] = result
+            return result
         except Exception as e:
             print(f"Error processing row {brand_name}: {e}")
             # Calculate contactability: 30 if website available, 0 otherwise
@@ -227,11 +344,9 @@ async def process_row(row: dict) -> dict:
 
 async def process_excel_background(job_id: str, df: pd.DataFrame):
     jobs[job_id]["status"] = "running"
-    results = []
     
     # Remove empty rows and deduplicate before processing
-    df = df.dropna(subset=["Business Name"])
-    df = df.drop_duplicates(subset=["Business Name"], keep='first')
+    df = drop_blank_names(df, "Business Name")
     
     # Create tasks
     tasks = []
@@ -239,51 +354,17 @@ async def process_excel_background(job_id: str, df: pd.DataFrame):
     # User said "thousands of rows", so we should process all, but carefully.
     # For this demo task, I'll process all.
     
-    for i, row in df.iterrows():
-        tasks.append(process_row(row.to_dict()))
+    for row in df.to_dict('records'):
+        tasks.append(process_row(row))
     
-    # execution
-    processed_rows = await asyncio.gather(*tasks)
-    
-    # Filter out None results (skipped rows)
-    processed_rows = [r for r in processed_rows if r is not None]
-    
-    # Flatten structure for CSV - matching social leads format exactly
-    flattened_rows = []
-    for r in processed_rows:
-        flat = {}
-        # Manually flatten in the exact order as social leads
-        flat["brand_name"] = clean_excel_value(r.get("brand_name"))
-        flat["source"] = clean_excel_value(r.get("source"))
-        flat["category_main_industry"] = clean_excel_value(r.get("category_main_industry"))
-        flat["confidence_score"] = r.get("confidence_score")
-        flat["contactibility_score"] = r.get("contactibility_score")
-        flat["enrichment_status"] = clean_excel_value(r.get("enrichment_status"))
-        
-        company = r.get("company", {})
-        flat["company_phone"] = clean_excel_value(company.get("phone"))
-        flat["company_email"] = clean_excel_value(company.get("email"))
-        flat["company_website"] = clean_excel_value(company.get("website"))
-        flat["company_other"] = clean_excel_value(company.get("Other"))
-        
-        dm = r.get("decision_maker_1", {})
-        flat["dm_name"] = clean_excel_value(dm.get("name"))
-        flat["dm_job_title"] = clean_excel_value(dm.get("job_title"))
-        flat["dm_mobile"] = clean_excel_value(dm.get("mobile_number"))
-        flat["dm_contact"] = clean_excel_value(dm.get("contact_number"))
-        flat["dm_email"] = clean_excel_value(dm.get("work_email"))
-        
-        flat["ai_reason_to_call"] = clean_excel_value(r.get("ai_reason_to_call"))
-        flat["notes"] = clean_excel_value(r.get("notes"))
-        
-        flattened_rows.append(flat)
-
-    # Save to CSV
+    # Write each lead as soon as it finishes instead of holding every row until the end
     output_filename = f"processed_{job_id}.csv"
-    pd.DataFrame(flattened_rows).to_csv(output_filename, index=False)
-    
-    jobs[job_id]["status"] = "completed"
-    jobs[job_id]["output_file"] = output_filename
+    with job_output(job_id, output_filename) as (f, writer):
+        async for lead in as_completed_with_progress(job_id, tasks):
+            # None results are skipped rows
+            if lead is not None:
+                writer.writerow(flatten_lead(lead))
+                f.flush()
 
 async def process_social_row(row: dict, is_retry: bool = False) -> dict:
     async with concurrency_limit:
@@ -324,13 +405,10 @@ async def process_social_row(row: dict, is_retry: bool = False) -> dict:
             
             # Extract JSON
             try:
-                import json
-                import re
                 raw_output = str(result.raw) if hasattr(result, 'raw') else str(result)
-                json_match = re.search(r'\{.*\}', raw_output, re.DOTALL)
+                data = extract_json(raw_output)
                 
-                if json_match:
-                    data = json.loads(json_match.group(0))
+                if data is not None:
                     
                     # Clean up "..." artifacts if present
                     def clean(val):
@@ -464,13 +542,10 @@ async def process_business_row(row: dict) -> dict:
             
             # Extract JSON
             try:
-                import json
-                import re
                 raw_output = str(result.raw) if hasattr(result, 'raw') else str(result)
-                json_match = re.search(r'\{.*\}', raw_output, re.DOTALL)
+                data = extract_json(raw_output)
                 
-                if json_match:
-                    data = json.loads(json_match.group(0))
+                if data is not None:
                     
                     # Clean up "..." artifacts
                     def clean(val):
@@ -578,77 +653,39 @@ async def process_social_excel_background(job_id: str, df: pd.DataFrame):
     jobs[job_id]["status"] = "running"
     
     # Remove empty rows and deduplicate
-    df = df.dropna(subset=["Brand"])
-    df = df.drop_duplicates(subset=["Brand"], keep='first')
+    df = drop_blank_names(df, "Brand")
     
     # First Pass
     tasks = []
-    for i, row in df.iterrows():
-        tasks.append(process_social_row(row.to_dict()))
-    
-    results = await asyncio.gather(*tasks)
+    for row in df.to_dict('records'):
+        tasks.append(process_social_row(row))
     
-    final_results = []
-    retry_tasks = []
-    
-    for res in results:
-        if res is None: continue
+    output_filename = f"social_processed_{job_id}.csv"
+    with job_output(job_id, output_filename) as (f, writer):
+        retry_tasks = []
         
-        if res.get("needs_retry"):
-            print(f"Queueing retry for: {res['data']['brand_name']}")
-            retry_tasks.append(process_social_row(res["original_row"], is_retry=True))
-        else:
-            final_results.append(res["data"])
+        async for res in as_completed_with_progress(job_id, tasks):
+            if res is None: continue
             
-    # Second Pass (Retry once)
-    if retry_tasks:
-        print(f"Starting retry pass for {len(retry_tasks)} leads...")
-        retry_results = await asyncio.gather(*retry_tasks)
-        for r in retry_results:
-            if r:
-                final_results.append(r["data"])
-    
-    # Flatten
-    flattened_rows = []
-    for r in final_results:
-        flat = {}
-        # Manually flatten with Excel cleaning
-        flat["brand_name"] = clean_excel_value(r.get("brand_name"))
-        flat["source"] = clean_excel_value(r.get("source"))
-        flat["category_main_industry"] = clean_excel_value(r.get("category_main_industry"))
-        flat["confidence_score"] = r.get("confidence_score")
-        flat["contactibility_score"] = r.get("contactibility_score")
-        flat["enrichment_status"] = clean_excel_value(r.get("enrichment_status"))
-        
-        company = r.get("company", {})
-        flat["company_phone"] = clean_excel_value(company.get("phone"))
-        flat["company_email"] = clean_excel_value(company.get("email"))
-        flat["company_website"] = clean_excel_value(company.get("website"))
-        flat["company_other"] = clean_excel_value(company.get("Other"))
-        
-        dm = r.get("decision_maker_1", {})
-        flat["dm_name"] = clean_excel_value(dm.get("name"))
-        flat["dm_job_title"] = clean_excel_value(dm.get("job_title"))
-        flat["dm_mobile"] = clean_excel_value(dm.get("mobile_number"))
-        flat["dm_contact"] = clean_excel_value(dm.get("contact_number"))
-        flat["dm_email"] = clean_excel_value(dm.get("work_email"))
-        
-        flat["ai_reason_to_call"] = clean_excel_value(r.get("ai_reason_to_call"))
-        flat["notes"] = clean_excel_value(r.get("notes"))
-        
-        flattened_rows.append(flat)
-
-    output_filename = f"social_processed_{job_id}.csv"
-    pd.DataFrame(flattened_rows).to_csv(output_filename, index=False)
-    
-    jobs[job_id]["output_file"] = output_filename
-    jobs[job_id]["status"] = "completed"
+            if res.get("needs_retry"):
+                print(f"Queueing retry for: {res['data']['brand_name']}")
+                retry_tasks.append(process_social_row(res["original_row"], is_retry=True))
+            else:
+                writer.writerow(flatten_lead(res["data"]))
+                f.flush()
+                
+        # Second Pass (Retry once), counted as retries_done/retries_total so rows progress never goes backwards
+        if retry_tasks:
+            print(f"Starting retry pass for {len(retry_tasks)} leads...")
+            async for r in as_completed_with_progress(job_id, retry_tasks, counter="retries"):
+                if r:
+                    writer.writerow(flatten_lead(r["data"]))
+                    f.flush()
 
 @app.post("/analyze-social-leads")
 async def analyze_social_leads(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
+        df = await load_upload(file, read_excel_file)
         
         job_id = str(uuid.uuid4())
         jobs[job_id] = {"status": "queued"}
@@ -664,45 +701,18 @@ async def process_business_excel_background(job_id: str, df: pd.DataFrame):
     jobs[job_id]["status"] = "running"
     
     # Remove empty rows and deduplicate
-    df = df.dropna(subset=["Brand"])
-    df = df.drop_duplicates(subset=["Brand"], keep='first')
-    
-    # Process all rows
-    tasks = [process_business_row(row) for _, row in df.iterrows()]
-    results = await asyncio.gather(*tasks)
+    df = drop_blank_names(df, "Brand")
     
-    # Filter out None results
-    results = [r for r in results if r is not None]
+    # Process all rows, writing each lead as soon as it finishes
+    tasks = [process_business_row(row) for row in df.to_dict('records')]
     
-    # Flatten to CSV format (same as social leads)
-    flattened_rows = []
-    for lead_data in results:
-        flat = {
-            "brand_name": clean_excel_value(lead_data.get("brand_name", "")),
-            "source": clean_excel_value(lead_data.get("source", "business")),
-            "category_main_industry": clean_excel_value(lead_data.get("category_main_industry", "")),
-            "confidence_score": lead_data.get("confidence_score", 0),
-            "contactibility_score": lead_data.get("contactibility_score", 0),
-            "enrichment_status": clean_excel_value(lead_data.get("enrichment_status", "needs apollo")),
-            "company_phone": clean_excel_value(lead_data.get("company", {}).get("phone", "")),
-            "company_email": clean_excel_value(lead_data.get("company", {}).get("email", "")),
-            "company_website": clean_excel_value(lead_data.get("company", {}).get("website", "")),
-            "company_other": clean_excel_value(lead_data.get("company", {}).get("Other", "")),
-            "dm_name": clean_excel_value(lead_data.get("decision_maker_1", {}).get("name", "")),
-            "dm_job_title": clean_excel_value(lead_data.get("decision_maker_1", {}).get("job_title", "")),
-            "dm_mobile": clean_excel_value(lead_data.get("decision_maker_1", {}).get("mobile_number", "")),
-            "dm_contact": clean_excel_value(lead_data.get("decision_maker_1", {}).get("contact_number", "")),
-            "dm_email": clean_excel_value(lead_data.get("decision_maker_1", {}).get("work_email", "")),
-            "ai_reason_to_call": clean_excel_value(lead_data.get("ai_reason_to_call", "")),
-            "notes": clean_excel_value(lead_data.get("notes", ""))
-        }
-        flattened_rows.append(flat)
-
     output_filename = f"business_processed_{job_id}.csv"
-    pd.DataFrame(flattened_rows).to_csv(output_filename, index=False)
-    
-    jobs[job_id]["output_file"] = output_filename
-    jobs[job_id]["status"] = "completed"
+    with job_output(job_id, output_filename) as (f, writer):
+        async for lead_data in as_completed_with_progress(job_id, tasks):
+            # Filter out None results
+            if lead_data is not None:
+                writer.writerow(flatten_lead(lead_data))
+                f.flush()
 
 @app.post("/analyze_business_leads_post")
 async def analyze_business_leads_post(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
@@ -711,13 +721,11 @@ async def analyze_business_leads_post(background_tasks: BackgroundTasks, file: U
     Accepts CSV or Excel with columns: Brand, Reason to call for OOH, Contact, Email, Website, Category, Address, Notes, Extra notes
     """
     try:
-        contents = await file.read()
-        
         # Detect file type and read accordingly
         if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
+            df = await load_upload(file, pd.read_csv)
         elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(io.BytesIO(contents))
+            df = await load_upload(file, read_excel_file)
         else:
             raise HTTPException(status_code=400, detail="File must be CSV or Excel (.csv, .xlsx, .xls)")
         
@@ -734,9 +742,8 @@ async def analyze_business_leads_post(background_tasks: BackgroundTasks, file: U
 @app.post("/analyze-leads")
 async def analyze_leads(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     try:
-        contents = await file.read()
         # Handle Excel
-        df = pd.read_excel(io.BytesIO(contents))
+        df = await load_upload(file, read_excel_file)
         
         job_id = str(uuid.uuid4())
         jobs[job_id] = {"status": "queued"}
@@ -758,11 +765,17 @@ async def get_status(job_id: str):
 @app.get("/download/{job_id}")
 async def download_results(job_id: str):
     job = jobs.get(job_id)
-    if not job or job["status"] != "completed":
+    # Running and failed jobs serve the rows finished so far
+    if not job or "output_file" not in job:
         raise HTTPException(status_code=400, detail="Job not ready or not found")
         
     file_path = job["output_file"]
     if os.path.exists(file_path):
+        if job["status"] == "running":
+            # Snapshot the growing file; FileResponse would stream past the Content-Length it sent
+            with open(file_path, "rb") as f:
+                content = await asyncio.to_thread(f.read)
+            return Response(content, media_type='text/csv', headers={"Content-Disposition": 'attachment; filename="qualified_leads.csv"'})
         return FileResponse(file_path, media_type='text/csv', filename="qualified_leads.csv")
     else:
         raise HTTPException(status_code=500, detail="File lost")
\ No newline at end of file
@@ -0,0 +1,42 @@
+import orjson
+
+def extract_json(raw: str, required_key: str = None):
+    """First JSON object in crew output (optionally one containing `required_key`), or None."""
+    text = raw.strip()
+    # Fast path: the whole output is the object
+    if text.startswith("{"):
+        try:
+            data = orjson.loads(text)
+            if isinstance(data, dict) and (required_key is None or required_key in data):
+                return data
+        except orjson.JSONDecodeError:
+            pass
+    # Otherwise one pass that tries each balanced {...} span as it closes, skipping braces inside strings.
+    # JSON strings can't hold raw newlines, so a stray quote in prose only misleads the rest of its line
+    starts, in_string, escaped, found = [], False, False, None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"' or ch == "\n":
+                in_string = False
+        elif ch == '"':
+            in_string = bool(starts)
+        elif ch == "{":
+            starts.append(i)
+        elif ch == "}" and starts:
+            start = starts.pop()
+            # An enclosing object (smaller start) wins over one found inside it
+            if found is None or start < found[0]:
+                try:
+                    data = orjson.loads(text[start:i + 1])
+                    if isinstance(data, dict) and (required_key is None or required_key in data):
+                        found = (start, data)
+                except orjson.JSONDecodeError:
+                    pass
+            # Nothing still open can enclose it, so it's the first match; a stray "{" just defers this to the end
+            if found is not None and not starts:
+                return found[1]
+    return found[1] if found is not None else None
@@ -0,0 +1,26 @@
+from app.parsing import extract_json
+
+
+def test_extract_json_whole_output():
+    assert extract_json('{"confidence_score": 80}', "confidence_score") == {"confidence_score": 80}
+
+
+def test_extract_json_skips_leading_stray_brace():
+    raw = 'Thought: use the { placeholder\n{"confidence_score": 80, "notes": "a } in a string"}'
+    assert extract_json(raw, "confidence_score") == {"confidence_score": 80, "notes": "a } in a string"}
+
+
+def test_extract_json_requires_key():
+    raw = '{"other": 1} then {"confidence_score": 55}'
+    assert extract_json(raw, "confidence_score") == {"confidence_score": 55}
+    assert extract_json('{"other": 1}', "confidence_score") is None
+
+
+def test_extract_json_many_stray_braces_single_pass():
+    raw = "{ " * 20000 + '{"confidence_score": 80}'
+    assert extract_json(raw, "confidence_score") == {"confidence_score": 80}
+
+
+def test_extract_json_prefers_enclosing_object():
+    raw = 'Result: {"company": {"phone": "+971 4 123 4567"}, "confidence_score": 70} done'
+    assert extract_json(raw) == {"company": {"phone": "+971 4 123 4567"}, "confidence_score": 70}